@@ -27,8 +27,11 @@ BLACKLIST_MINTS = _get_set("BLACKLIST_MINTS", "")
 ENABLE_PUMPFUN = os.getenv("ENABLE_PUMPFUN", "true").lower() == "true"
 PUMPFUN_BASE = os.getenv("PUMPFUN_BASE", "https://pumpportal.fun/api")
 PUMPFUN_API_KEY = os.getenv("PUMPFUN_API_KEY", "").strip()
-PUMPFUN_MODE = os.getenv("PUMPFUN_MODE", "local").lower()  # local | lightning
+PUMPFUN_MODE = os.getenv("PUMPFUN_MODE", "local").lower()  # local | lightning | native (builder solders, no HTTP)
 PUMP_ONLY = (os.getenv("PUMP_ONLY", "true").lower() == "true")
+# ComputeBudget per le tx Pump.fun native (0 = istruzione omessa)
+PUMPFUN_CU_LIMIT = int(os.getenv("PUMPFUN_CU_LIMIT", "200000"))
+PUMPFUN_PRIORITY_FEE_MICROLAMPORTS = int(os.getenv("PUMPFUN_PRIORITY_FEE_MICROLAMPORTS", "100000"))
 
 # Mode
 TEST_MODE = os.getenv("TEST_MODE", "false").lower() == "true"
@@ -8,6 +8,8 @@ from .history import append_row, now_utc_str
 from . import config
 from .jupiter import JupiterClient, execute_swap_via_jupiter
 from .pumpfun import trade_local_b64
+from .pumpfun_native import build_pump_tx_bytes, fetch_bonding_curve, fetch_fee_recipient, fetch_token_program
+from .tx_retry import send_pump_local_with_retry
 from . import notifier
 
 @dataclass
@@ -90,8 +92,25 @@ class CopyEngine:
             notifier.notify(f"🟢 BUY eseguito {amount_copy_sol:.6f} SOL → {mint} | sig {sig[:12]}… (Jupiter)")
             return
 
-        # 2) PumpPortal local (opzionale)
-        if getattr(config, "ENABLE_PUMPFUN", True):
+        # 2) Pump.fun: nativo (tx costruita in locale, niente hop HTTP) oppure PumpPortal local.
+        #    In modalità native trade-local non viene mai chiamato.
+        if getattr(config, "ENABLE_PUMPFUN", True) and getattr(config, "PUMPFUN_MODE", "local") == "native":
+            try:
+                sig2 = self._send_pump_native(mint, "buy", amount_lamports, 0.0, slippage)
+                if sig2:
+                    self._add_spent(amount_copy_sol)
+                    append_row({
+                        "ts_utc": now_utc_str(), "action": "EXEC_BUY",
+                        "mint": mint, "amount_token_ui": "", "amount_sol": f"{amount_copy_sol:.9f}",
+                        "copy_ratio": f"{ratio}", "slippage_bps": f"{slippage}",
+                        "tx_signature": sig2, "src_signature": "", "note": "PUMPFUN_NATIVE"
+                    })
+                    notifier.notify(f"🟢 BUY eseguito {amount_copy_sol:.6f} SOL → {mint} | sig {sig2[:12]}… (Pump.fun nativo)")
+                    return
+            except Exception as e:
+                notifier.notify(f"⚠️ Pump.fun nativo BUY errore: {e}")
+
+        elif getattr(config, "ENABLE_PUMPFUN", True):
             tx_b64 = trade_local_b64(
                 getattr(config, "PUMPFUN_BASE", "https://pumpportal.fun/api"),
                 self.my_pub, mint, "buy", amount_lamports, 0.0, slippage
@@ -111,7 +130,7 @@ class CopyEngine:
                 except Exception as e:
                     notifier.notify(f"⚠️ PumpPortal Local BUY errore: {e}")
 
-        notifier.notify(f"⚠️ Nessuna rotta (Jupiter/PumpPortal) per BUY {amount_copy_sol:.6f} SOL → {mint}.")
+        notifier.notify(f"⚠️ Nessuna rotta (Jupiter/Pump.fun nativo/PumpPortal) per BUY {amount_copy_sol:.6f} SOL → {mint}.")
 
     # ---------- SELL ----------
     def replicate_sell(self, mint: str, qty_token_ui: float):
@@ -139,7 +158,22 @@ class CopyEngine:
         # -> tentiamo via PumpPortal local; in alternativa potremmo espandere Jupiter per SELL con mintDecimals.
         from .jupiter import JupiterClient
         # TODO: per SELL seriamente, integra getMint decimals. Per ora usiamo PumpPortal local se disponibile.
-        if getattr(config, "ENABLE_PUMPFUN", True):
+        if getattr(config, "ENABLE_PUMPFUN", True) and getattr(config, "PUMPFUN_MODE", "local") == "native":
+            try:
+                sig = self._send_pump_native(mint, "sell", 0, float(qty_token_ui), slippage)
+                if sig:
+                    append_row({
+                        "ts_utc": now_utc_str(), "action": "EXEC_SELL",
+                        "mint": mint, "amount_token_ui": f"{qty_token_ui:.9f}", "amount_sol": "",
+                        "copy_ratio": f"{config.COPY_RATIO}", "slippage_bps": f"{slippage}",
+                        "tx_signature": sig, "src_signature": "", "note": "PUMPFUN_NATIVE"
+                    })
+                    notifier.notify(f"🟢 SELL eseguito {qty_token_ui:.6f} {mint} → SOL | sig {sig[:12]}… (Pump.fun nativo)")
+                    return
+            except Exception as e:
+                notifier.notify(f"⚠️ Pump.fun nativo SELL errore: {e}")
+
+        elif getattr(config, "ENABLE_PUMPFUN", True):
             tx_b64 = trade_local_b64(
                 getattr(config, "PUMPFUN_BASE", "https://pumpportal.fun/api"),
                 self.my_pub, mint, "sell", 0, float(qty_token_ui), slippage
@@ -158,9 +192,34 @@ class CopyEngine:
                 except Exception as e:
                     notifier.notify(f"⚠️ PumpPortal Local SELL errore: {e}")
 
-        notifier.notify(f"⚠️ Nessuna rotta disponibile per SELL {qty_token_ui:.6f} {mint} → SOL.")
+        notifier.notify(f"⚠️ Nessuna rotta (Pump.fun nativo/PumpPortal) per SELL {qty_token_ui:.6f} {mint} → SOL.")
 
     # ---------- low-level ----------
     def _send_b64(self, tx_b64: str) -> str:
         from .solana_utils import send_and_confirm_b64_tx
         return send_and_confirm_b64_tx(self.client, tx_b64)
+
+    def _send_pump_native(self, mint: str, side: str, amount_lamports: int, qty_token_ui: float, slippage_bps: int) -> Optional[str]:
+        """
+        Costruisce la tx Pump.fun in locale e la invia con retry su blockhash (firma unica in tx_retry).
+        Curve, token program e fee recipient si leggono una volta sola: i retry rifanno solo il blockhash.
+        Torna None se il mint non è (più) sulla bonding curve.
+        """
+        from solana.rpc.commitment import Confirmed
+        from solders.signature import Signature
+        curve = fetch_bonding_curve(self.client, mint)
+        if curve is None or curve.complete:
+            return None
+        token_program = fetch_token_program(self.client, mint)
+        fee_recipient = fetch_fee_recipient(self.client)
+        sig = send_pump_local_with_retry(
+            self.client, self.kp,
+            lambda: build_pump_tx_bytes(
+                self.client, self.kp.pubkey(), mint, side, curve, token_program,
+                amount_lamports, qty_token_ui, slippage_bps, fee_recipient,
+                int(getattr(config, "PUMPFUN_CU_LIMIT", 0)),
+                int(getattr(config, "PUMPFUN_PRIORITY_FEE_MICROLAMPORTS", 0)),
+            ),
+        )
+        self.client.confirm_transaction(Signature.from_string(sig), commitment=Confirmed)
+        return sig
@@ -0,0 +1,317 @@
+# src/pumpfun_native.py — builder locale delle tx Pump.fun (buy/sell) senza hop HTTP trade-local
+from __future__ import annotations
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import VersionedTransaction
+
+PUMP_PROGRAM_ID = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
+PUMP_FEE_PROGRAM_ID = Pubkey.from_string("pfeeUxB6jkeY1Hxd7CsFCAjcbHA9rWtchMGdZ6VojVZ")
+PUMP_FEE_RECIPIENT = Pubkey.from_string("CebN5WGQ4jvEPvsVU4EoHEpgzq1VV7AbicfhtW4xC9iM")
+TOKEN_PROGRAM_ID = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+TOKEN_2022_PROGRAM_ID = Pubkey.from_string("TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb")
+ASSOCIATED_TOKEN_PROGRAM_ID = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
+SYSTEM_PROGRAM_ID = Pubkey.from_string("11111111111111111111111111111111")
+
+PUMP_GLOBAL = Pubkey.find_program_address([b"global"], PUMP_PROGRAM_ID)[0]
+PUMP_EVENT_AUTHORITY = Pubkey.find_program_address([b"__event_authority"], PUMP_PROGRAM_ID)[0]
+PUMP_GLOBAL_VOLUME_ACCUMULATOR = Pubkey.find_program_address([b"global_volume_accumulator"], PUMP_PROGRAM_ID)[0]
+PUMP_FEE_CONFIG = Pubkey.find_program_address([b"fee_config", bytes(PUMP_PROGRAM_ID)], PUMP_FEE_PROGRAM_ID)[0]
+
+# discriminator Anchor: sha256("global:buy")[:8] / sha256("global:sell")[:8]
+BUY_DISCRIMINATOR = bytes([102, 6, 61, 18, 1, 218, 235, 234])
+SELL_DISCRIMINATOR = bytes([51, 230, 133, 164, 1, 127, 131, 173])
+
+PUMP_TOKEN_DECIMALS = 6
+# Fee protocollo + creator sono configurabili on-chain (fee_config, a scaglioni): qui non le leggiamo,
+# usiamo un tetto prudente così token richiesti (buy) e min_sol_output (sell) restano dentro margine.
+PUMP_MAX_FEE_BPS = 200
+
+@dataclass(frozen=True)
+class PumpAccounts:
+    mint: Pubkey
+    token_program: Pubkey
+    bonding_curve: Pubkey
+    associated_bonding_curve: Pubkey
+    bonding_curve_v2: Pubkey
+
+@lru_cache(maxsize=2048)
+def get_associated_token_address(owner: str, mint: str, token_program: str = str(TOKEN_PROGRAM_ID)) -> Pubkey:
+    return Pubkey.find_program_address(
+        [bytes(Pubkey.from_string(owner)), bytes(Pubkey.from_string(token_program)), bytes(Pubkey.from_string(mint))],
+        ASSOCIATED_TOKEN_PROGRAM_ID,
+    )[0]
+
+@lru_cache(maxsize=2048)
+def derive_pump_accounts(mint: str, token_program: str = str(TOKEN_PROGRAM_ID)) -> PumpAccounts:
+    """
+    PDA della bonding curve e relativo ATA. Derivarli costa qualche find_program_address,
+    quindi li teniamo in cache per mint (il bot rivede spesso gli stessi token).
+    """
+    mint_pk = Pubkey.from_string(mint)
+    curve = Pubkey.find_program_address([b"bonding-curve", bytes(mint_pk)], PUMP_PROGRAM_ID)[0]
+    curve_v2 = Pubkey.find_program_address([b"bonding-curve-v2", bytes(mint_pk)], PUMP_PROGRAM_ID)[0]
+    return PumpAccounts(
+        mint_pk, Pubkey.from_string(token_program), curve,
+        get_associated_token_address(str(curve), mint, token_program), curve_v2,
+    )
+
+@lru_cache(maxsize=2048)
+def get_creator_vault(creator: str) -> Pubkey:
+    return Pubkey.find_program_address([b"creator-vault", bytes(Pubkey.from_string(creator))], PUMP_PROGRAM_ID)[0]
+
+@lru_cache(maxsize=64)
+def get_user_volume_accumulator(user: str) -> Pubkey:
+    return Pubkey.find_program_address([b"user_volume_accumulator", bytes(Pubkey.from_string(user))], PUMP_PROGRAM_ID)[0]
+
+@lru_cache(maxsize=2048)
+def fetch_token_program(client, mint: str) -> Pubkey:
+    """Owner del mint (SPL Token o Token-2022), in cache per mint come le PDA. Gli errori non vanno in cache."""
+    acc = client.get_account_info(Pubkey.from_string(mint)).value
+    if acc is None:
+        raise ValueError(f"Mint {mint} non trovato")
+    if acc.owner not in (TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID):
+        raise ValueError(f"{mint} non è un mint SPL Token/Token-2022 (owner {acc.owner})")
+    return acc.owner
+
+@lru_cache(maxsize=8)
+def fetch_fee_recipient(client) -> Pubkey:
+    """fee_recipient dall'account Global (8 discriminator + initialized + authority), letto una volta sola."""
+    acc = client.get_account_info(PUMP_GLOBAL).value
+    if acc is None or len(bytes(acc.data)) < 73:
+        raise ValueError(f"Account Global Pump.fun {PUMP_GLOBAL} non leggibile")
+    return Pubkey.from_bytes(bytes(acc.data)[41:73])
+
+@dataclass
+class BondingCurveState:
+    virtual_token_reserves: int
+    virtual_sol_reserves: int
+    real_token_reserves: int
+    real_sol_reserves: int
+    token_total_supply: int
+    complete: bool
+    creator: Pubkey
+    is_mayhem_mode: bool = False
+    is_cashback_coin: bool = False
+
+    @classmethod
+    def from_account_data(cls, data: bytes) -> "BondingCurveState":
+        # layout: 8 byte discriminator Anchor, 5 x u64, bool, creator pubkey, poi (account recenti) mayhem e cashback
+        if len(data) < 81:
+            raise ValueError(f"Account bonding curve troppo corto ({len(data)} bytes)")
+        vt, vs, rt, rs, supply, complete, creator = struct.unpack_from("<QQQQQ?32s", data, 8)
+        mayhem = len(data) > 81 and data[81] != 0
+        cashback = len(data) > 82 and data[82] != 0
+        return cls(vt, vs, rt, rs, supply, complete, Pubkey.from_bytes(creator), mayhem, cashback)
+
+    def tokens_for_sol(self, lamports_in: int, fee_bps: int = PUMP_MAX_FEE_BPS) -> int:
+        """Token (base units) ottenuti spendendo 'lamports_in' fee inclusa."""
+        net = lamports_in * 10_000 // (10_000 + fee_bps)
+        out = self.virtual_token_reserves * net // (self.virtual_sol_reserves + net)
+        return min(out, self.real_token_reserves)
+
+    def sol_for_tokens(self, token_amount: int, fee_bps: int = PUMP_MAX_FEE_BPS) -> int:
+        """Lamports ricevuti vendendo 'token_amount' (base units), fee già dedotta."""
+        gross = self.virtual_sol_reserves * token_amount // (self.virtual_token_reserves + token_amount)
+        return gross - gross * fee_bps // 10_000
+
+def fetch_bonding_curve(client, mint: str) -> Optional[BondingCurveState]:
+    resp = client.get_account_info(derive_pump_accounts(mint).bonding_curve)
+    acc = resp.value
+    if acc is None:
+        return None
+    return BondingCurveState.from_account_data(bytes(acc.data))
+
+# ---------- istruzioni (pure, verificabili offline) ----------
+def build_create_ata_idempotent_ix(payer: Pubkey, owner: Pubkey, mint: Pubkey, token_program: Pubkey = TOKEN_PROGRAM_ID) -> Instruction:
+    ata = get_associated_token_address(str(owner), str(mint), str(token_program))
+    accounts = [
+        AccountMeta(payer, is_signer=True, is_writable=True),
+        AccountMeta(ata, is_signer=False, is_writable=True),
+        AccountMeta(owner, is_signer=False, is_writable=False),
+        AccountMeta(mint, is_signer=False, is_writable=False),
+        AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+        AccountMeta(token_program, is_signer=False, is_writable=False),
+    ]
+    return Instruction(ASSOCIATED_TOKEN_PROGRAM_ID, bytes([1]), accounts)
+
+def build_buy_ix(
+    user: Pubkey,
+    mint: str,
+    token_amount: int,
+    max_sol_cost: int,
+    creator: Pubkey,
+    token_program: Pubkey = TOKEN_PROGRAM_ID,
+    fee_recipient: Pubkey = PUMP_FEE_RECIPIENT,
+) -> Instruction:
+    pa = derive_pump_accounts(mint, str(token_program))
+    accounts = [
+        AccountMeta(PUMP_GLOBAL, is_signer=False, is_writable=False),
+        AccountMeta(fee_recipient, is_signer=False, is_writable=True),
+        AccountMeta(pa.mint, is_signer=False, is_writable=False),
+        AccountMeta(pa.bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(pa.associated_bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(get_associated_token_address(str(user), mint, str(token_program)), is_signer=False, is_writable=True),
+        AccountMeta(user, is_signer=True, is_writable=True),
+        AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+        AccountMeta(token_program, is_signer=False, is_writable=False),
+        AccountMeta(get_creator_vault(str(creator)), is_signer=False, is_writable=True),
+        AccountMeta(PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
+        AccountMeta(PUMP_PROGRAM_ID, is_signer=False, is_writable=False),
+        AccountMeta(PUMP_GLOBAL_VOLUME_ACCUMULATOR, is_signer=False, is_writable=True),
+        AccountMeta(get_user_volume_accumulator(str(user)), is_signer=False, is_writable=True),
+        AccountMeta(PUMP_FEE_CONFIG, is_signer=False, is_writable=False),
+        AccountMeta(PUMP_FEE_PROGRAM_ID, is_signer=False, is_writable=False),
+        AccountMeta(pa.bonding_curve_v2, is_signer=False, is_writable=False),
+    ]
+    # args: amount u64, max_sol_cost u64, track_volume OptionBool
+    data = BUY_DISCRIMINATOR + struct.pack("<QQ?", token_amount, max_sol_cost, True)
+    return Instruction(PUMP_PROGRAM_ID, data, accounts)
+
+def build_sell_ix(
+    user: Pubkey,
+    mint: str,
+    token_amount: int,
+    min_sol_output: int,
+    creator: Pubkey,
+    token_program: Pubkey = TOKEN_PROGRAM_ID,
+    fee_recipient: Pubkey = PUMP_FEE_RECIPIENT,
+) -> Instruction:
+    pa = derive_pump_accounts(mint, str(token_program))
+    # NB: rispetto al buy, creator_vault e token_program sono invertiti
+    accounts = [
+        AccountMeta(PUMP_GLOBAL, is_signer=False, is_writable=False),
+        AccountMeta(fee_recipient, is_signer=False, is_writable=True),
+        AccountMeta(pa.mint, is_signer=False, is_writable=False),
+        AccountMeta(pa.bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(pa.associated_bonding_curve, is_signer=False, is_writable=True),
+        AccountMeta(get_associated_token_address(str(user), mint, str(token_program)), is_signer=False, is_writable=True),
+        AccountMeta(user, is_signer=True, is_writable=True),
+        AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+        AccountMeta(get_creator_vault(str(creator)), is_signer=False, is_writable=True),
+        AccountMeta(token_program, is_signer=False, is_writable=False),
+        AccountMeta(PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
+        AccountMeta(PUMP_PROGRAM_ID, is_signer=False, is_writable=False),
+        AccountMeta(PUMP_FEE_CONFIG, is_signer=False, is_writable=False),
+        AccountMeta(PUMP_FEE_PROGRAM_ID, is_signer=False, is_writable=False),
+        AccountMeta(pa.bonding_curve_v2, is_signer=False, is_writable=False),
+    ]
+    data = SELL_DISCRIMINATOR + struct.pack("<QQ", token_amount, min_sol_output)
+    return Instruction(PUMP_PROGRAM_ID, data, accounts)
+
+def _clamp_bps(bps: int) -> int:
+    return max(0, min(int(bps), 10_000))
+
+def _check_tradable(mint: str, curve: BondingCurveState) -> None:
+    if curve.complete:
+        raise ValueError(f"Bonding curve di {mint} completa (token migrato)")
+    # coin mayhem/cashback usano fee recipient e account diversi, non gestiti da questo builder
+    if curve.is_mayhem_mode:
+        raise ValueError(f"{mint} è una coin mayhem mode: non supportata dal builder nativo")
+    if curve.is_cashback_coin:
+        raise ValueError(f"{mint} è una coin cashback: non supportata dal builder nativo")
+
+def build_buy_ixs(
+    user: Pubkey, mint: str, lamports_in: int, slippage_bps: int,
+    curve: BondingCurveState, token_program: Pubkey = TOKEN_PROGRAM_ID,
+    fee_recipient: Pubkey = PUMP_FEE_RECIPIENT,
+) -> List[Instruction]:
+    _check_tradable(mint, curve)
+    token_amount = curve.tokens_for_sol(lamports_in)
+    if token_amount <= 0:
+        raise ValueError(f"BUY di {lamports_in} lamports su {mint} darebbe 0 token")
+    max_sol_cost = lamports_in * (10_000 + _clamp_bps(slippage_bps)) // 10_000
+    return [
+        build_create_ata_idempotent_ix(user, user, Pubkey.from_string(mint), token_program),
+        build_buy_ix(user, mint, token_amount, max_sol_cost, curve.creator, token_program, fee_recipient),
+    ]
+
+def build_sell_ixs(
+    user: Pubkey, mint: str, amount_tokens_ui: float, slippage_bps: int,
+    curve: BondingCurveState, token_program: Pubkey = TOKEN_PROGRAM_ID,
+    fee_recipient: Pubkey = PUMP_FEE_RECIPIENT,
+) -> List[Instruction]:
+    _check_tradable(mint, curve)
+    token_amount = int(round(amount_tokens_ui * 10 ** PUMP_TOKEN_DECIMALS))
+    if token_amount <= 0:
+        raise ValueError(f"SELL di {amount_tokens_ui} token su {mint} arrotonda a 0")
+    min_sol_output = curve.sol_for_tokens(token_amount) * (10_000 - _clamp_bps(slippage_bps)) // 10_000
+    return [build_sell_ix(user, mint, token_amount, min_sol_output, curve.creator, token_program, fee_recipient)]
+
+def build_compute_budget_ixs(cu_limit: int, cu_price_micro_lamports: int) -> List[Instruction]:
+    """Limite CU e priority fee (micro-lamports/CU); 0 = istruzione omessa."""
+    ixs = []
+    if cu_limit > 0:
+        ixs.append(set_compute_unit_limit(cu_limit))
+    if cu_price_micro_lamports > 0:
+        ixs.append(set_compute_unit_price(cu_price_micro_lamports))
+    return ixs
+
+def compile_unsigned_tx(payer: Pubkey, ixs: List[Instruction], blockhash: Hash) -> VersionedTransaction:
+    """Tx v0 con firma vuota: la firma la mette tx_retry.send_pump_local_with_retry (come per trade-local)."""
+    msg = MessageV0.try_compile(payer, ixs, [], blockhash)
+    return VersionedTransaction.populate(msg, [Signature.default()])
+
+def pump_ix_from_tx(raw: bytes) -> Optional[Instruction]:
+    """
+    Estrae l'istruzione Pump.fun da una tx registrata (bytes, legacy o v0) ricostruendo gli
+    AccountMeta, così da confrontarla offline con build_buy_ix / build_sell_ix. Solo chiavi
+    statiche (tx con address lookup table non sono risolvibili senza RPC): altrimenti None.
+    La writability viene dall'header, cioè è l'unione su tutte le istruzioni della tx: un account
+    può risultare writable anche se l'istruzione Pump.fun da sola non lo richiede.
+    """
+    msg = VersionedTransaction.from_bytes(raw).message
+    keys = msg.account_keys
+    # writability dall'header (stessa regola per Message legacy e MessageV0, solo chiavi statiche)
+    h = msg.header
+    n_signed = h.num_required_signatures
+
+    def is_writable(i: int) -> bool:
+        if i < n_signed:
+            return i < n_signed - h.num_readonly_signed_accounts
+        return i < len(keys) - h.num_readonly_unsigned_accounts
+
+    for cix in msg.instructions:
+        if keys[cix.program_id_index] != PUMP_PROGRAM_ID:
+            continue
+        if any(i >= len(keys) for i in cix.accounts):
+            return None
+        accounts = [AccountMeta(keys[i], msg.is_signer(i), is_writable(i)) for i in cix.accounts]
+        return Instruction(PUMP_PROGRAM_ID, bytes(cix.data), accounts)
+    return None
+
+# ---------- entrypoint per CopyEngine ----------
+def build_pump_tx_bytes(
+    client,
+    user: Pubkey,
+    mint: str,
+    side: str,                 # "buy" | "sell"
+    curve: BondingCurveState,
+    token_program: Pubkey,
+    amount_lamports: int = 0,  # per BUY (SOL in)
+    amount_tokens_ui: float = 0.0,  # per SELL (token qty)
+    slippage_bps: int = 150,
+    fee_recipient: Pubkey = PUMP_FEE_RECIPIENT,
+    cu_limit: int = 0,
+    cu_price_micro_lamports: int = 0,
+) -> bytes:
+    """
+    Equivalente locale di pumpfun.trade_local_b64: BYTES di una tx non firmata, pronta per
+    tx_retry.send_pump_local_with_retry. Curve, token program e fee recipient li passa il chiamante,
+    così ogni retry rifà solo il blockhash. Solleva ValueError se la tx non è costruibile.
+    """
+    if side.lower() == "buy":
+        ixs = build_buy_ixs(user, mint, amount_lamports, slippage_bps, curve, token_program, fee_recipient)
+    else:
+        ixs = build_sell_ixs(user, mint, amount_tokens_ui, slippage_bps, curve, token_program, fee_recipient)
+    ixs = build_compute_budget_ixs(cu_limit, cu_price_micro_lamports) + ixs
+    blockhash = client.get_latest_blockhash().value.blockhash
+    return bytes(compile_unsigned_tx(user, ixs, blockhash))
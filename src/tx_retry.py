@@ -27,7 +27,8 @@ def send_raw(client, raw_signed: bytes) -> str:
 
 def send_pump_local_with_retry(client, keypair, build_bytes_fn: Callable[[], bytes], retries: int = 3, backoff_s: float = 0.2) -> str:
     """
-    build_bytes_fn: funzione senza argomenti -> BYTES della tx (nuova trade-local ogni volta).
+    build_bytes_fn: funzione senza argomenti -> BYTES della tx (nuova trade-local ogni volta,
+    oppure pumpfun_native.build_pump_tx_bytes che rifà solo il blockhash, senza HTTP).
     Firma e invia. Se vede "Blockhash not found", ricostruisce e riprova fino a 'retries'.
     """
     attempt = 0
@@ -0,0 +1,5 @@
+# tests/conftest.py — src/config.py si rifiuta di partire senza wallet: valori fittizi per i test
+import os
+
+os.environ.setdefault("TARGET_WALLET", "11111111111111111111111111111111")
+os.environ.setdefault("SECRET_KEY_BASE58", "test-only")
@@ -0,0 +1,138 @@
+# tests/test_copy_engine_native.py — CopyEngine con PUMPFUN_MODE=native su un client RPC finto
+import base64
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from solders.compute_budget import ID as COMPUTE_BUDGET_ID
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from src import config, copy_engine, tx_retry
+from src.copy_engine import CopyEngine
+from src.pumpfun_native import PUMP_GLOBAL, PUMP_PROGRAM_ID, TOKEN_PROGRAM_ID, derive_pump_accounts, pump_ix_from_tx
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+MINT = "2xRWeUWAWB5Tuex9mHSxakTKbyNr8vp4NdPVqh3Uc7EN"
+FEE_RECIPIENT = Keypair.from_seed(bytes([5] * 32)).pubkey()
+
+def _curve_data(complete: bool = False, mayhem: bool = False) -> bytes:
+    with open(os.path.join(FIXTURES, "pump_bonding_curve_account.json"), "r", encoding="utf-8") as f:
+        data = bytearray(base64.b64decode(json.load(f)["data_b64"]))
+    data[48], data[81] = complete, mayhem
+    return bytes(data)
+
+class StubClient:
+    """get_account_info da dizionario; il primo send fallisce con 'Blockhash not found'."""
+
+    def __init__(self, curve_data=None, blockhash_failures: int = 1):
+        self.accounts = {
+            Pubkey.from_string(MINT): SimpleNamespace(owner=TOKEN_PROGRAM_ID, data=b""),
+            PUMP_GLOBAL: SimpleNamespace(owner=PUMP_PROGRAM_ID, data=bytes(8) + b"\x01" + bytes(32) + bytes(FEE_RECIPIENT)),
+        }
+        if curve_data is not None:
+            self.accounts[derive_pump_accounts(MINT).bonding_curve] = SimpleNamespace(owner=PUMP_PROGRAM_ID, data=curve_data)
+        self.blockhash_failures = blockhash_failures
+        self.account_calls = []
+        self.blockhash_calls = 0
+        self.sent = []
+        self.confirmed = []
+
+    def get_account_info(self, pubkey):
+        self.account_calls.append(pubkey)
+        return SimpleNamespace(value=self.accounts.get(pubkey))
+
+    def get_latest_blockhash(self):
+        self.blockhash_calls += 1
+        return SimpleNamespace(value=SimpleNamespace(blockhash=Hash.new_unique()))
+
+    def send_raw_transaction(self, raw, opts=None):
+        self.sent.append(raw)
+        if len(self.sent) <= self.blockhash_failures:
+            raise Exception("RPC error: Blockhash not found")
+        return SimpleNamespace(value=VersionedTransaction.from_bytes(raw).signatures[0])
+
+    def confirm_transaction(self, sig, commitment=None):
+        self.confirmed.append(sig)
+
+@pytest.fixture
+def rows(monkeypatch):
+    out = []
+    monkeypatch.setattr(config, "PUMPFUN_MODE", "native")
+    monkeypatch.setattr(config, "ENABLE_PUMPFUN", True)
+    monkeypatch.setattr(config, "DRY_RUN", False)
+    monkeypatch.setattr(config, "BLACKLIST_MINTS", "")
+    monkeypatch.setattr(config, "COPY_EVENTS", {"BUY", "SELL"})
+    monkeypatch.setattr(config, "COPY_RATIO", 0.25)
+    monkeypatch.setattr(config, "MAX_PER_TRADE_SOL", 0.5)
+    monkeypatch.setattr(config, "DAILY_SOL_BUDGET", 2.0)
+    monkeypatch.setattr(config, "PUMPFUN_CU_LIMIT", 150_000)
+    monkeypatch.setattr(config, "PUMPFUN_PRIORITY_FEE_MICROLAMPORTS", 25_000)
+    monkeypatch.setattr(copy_engine, "execute_swap_via_jupiter", lambda *a, **k: None)
+    monkeypatch.setattr(copy_engine, "append_row", out.append)
+    monkeypatch.setattr(tx_retry.time, "sleep", lambda s: None)
+
+    def no_trade_local(*a, **k):
+        raise AssertionError("trade_local_b64 chiamato in modalità native")
+    monkeypatch.setattr(copy_engine, "trade_local_b64", no_trade_local)
+    return out
+
+def _engine(client, kp):
+    return CopyEngine(client, kp, str(kp.pubkey()), {})
+
+def test_native_buy_retries_only_blockhash(rows):
+    kp = Keypair.from_seed(bytes([2] * 32))
+    client = StubClient(_curve_data())
+    engine = _engine(client, kp)
+    engine.replicate_buy(MINT, 0.4)  # 0.4 * 0.25 = 0.1 SOL
+
+    # curve, mint owner e Global letti una volta; il retry rifà solo blockhash + invio
+    assert client.account_calls == [derive_pump_accounts(MINT).bonding_curve, Pubkey.from_string(MINT), PUMP_GLOBAL]
+    assert client.blockhash_calls == 2
+    assert len(client.sent) == 2
+
+    tx = VersionedTransaction.from_bytes(client.sent[-1])
+    assert tx.message.account_keys[0] == kp.pubkey()
+    assert tx.verify_with_results() == [True]
+    programs = [tx.message.account_keys[ix.program_id_index] for ix in tx.message.instructions]
+    assert programs[:2] == [COMPUTE_BUDGET_ID, COMPUTE_BUDGET_ID]
+    assert pump_ix_from_tx(client.sent[-1]).accounts[1].pubkey == FEE_RECIPIENT
+
+    assert client.confirmed == [tx.signatures[0]]
+    assert engine.state["spent_today_sol"] == pytest.approx(0.1)
+    assert len(rows) == 1
+    assert rows[0]["action"] == "EXEC_BUY"
+    assert rows[0]["note"] == "PUMPFUN_NATIVE"
+    assert rows[0]["tx_signature"] == str(tx.signatures[0])
+
+def test_native_sell(rows):
+    kp = Keypair.from_seed(bytes([2] * 32))
+    client = StubClient(_curve_data(), blockhash_failures=0)
+    _engine(client, kp).replicate_sell(MINT, 1000.0)
+    assert len(client.sent) == 1
+    assert [r["note"] for r in rows] == ["PUMPFUN_NATIVE"]
+    assert rows[0]["action"] == "EXEC_SELL"
+
+@pytest.mark.parametrize("curve_data", [None, _curve_data(complete=True)], ids=["missing", "complete"])
+def test_native_no_curve_returns_none(rows, curve_data):
+    kp = Keypair.from_seed(bytes([2] * 32))
+    client = StubClient(curve_data)
+    engine = _engine(client, kp)
+    assert engine._send_pump_native(MINT, "buy", 100_000_000, 0.0, 150) is None
+    engine.replicate_buy(MINT, 0.4)
+    assert client.sent == []
+    assert client.account_calls == [derive_pump_accounts(MINT).bonding_curve] * 2
+    assert rows == []
+    assert engine.state["spent_today_sol"] == 0.0
+
+def test_native_mayhem_coin_not_sent(rows):
+    kp = Keypair.from_seed(bytes([2] * 32))
+    client = StubClient(_curve_data(mayhem=True))
+    engine = _engine(client, kp)
+    engine.replicate_buy(MINT, 0.4)
+    assert client.sent == []
+    assert rows == []
+    assert engine.state["spent_today_sol"] == 0.0